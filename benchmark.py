@@ -0,0 +1,362 @@
+import argparse
+import itertools
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from functools import cached_property
+from io import StringIO
+from pathlib import Path
+
+FIXTURE_DIR = Path(__file__).parent
+HTML_FIXTURE = FIXTURE_DIR / 'nvda-20240128.htm'
+PDF_FIXTURE = FIXTURE_DIR / 'nvda.pdf'
+TABLE_FIXTURE = FIXTURE_DIR / 'table.json'
+UNITABLE_FIXTURE = FIXTURE_DIR / 'unitable.xlsx'
+DEFAULT_BASELINE = FIXTURE_DIR / 'benchmark_baseline.json'
+
+# Cold-start scenarios: import the orchestrator and touch only the backends each run actually needs
+IMPORT_SCENARIOS = {
+    'import_html_only': 'from orchestrator import Orchestrator; Orchestrator().html_parser',
+    'import_pdf_only': 'from orchestrator import Orchestrator; Orchestrator().pymupdf; import pymupdf',
+}
+
+
+class StubMultiModalLLM:
+    """
+    Offline stand-in for the OpenAI multi-modal LLM that answers every
+    request with the table stored in table.json, once per 'Table <number>'
+    label in the prompt, so single and batched extraction run without network.
+    """
+
+    def __init__(self, table_path: Path = TABLE_FIXTURE) -> None:
+        """
+        Initialize the stub with the canned table response.
+
+        Args:
+            table_path (Path): Path to the JSON file holding a TableInfo payload.
+        """
+        with open(table_path) as file:
+            self.payload = json.load(file)
+        self.requests = 0
+
+    def complete(self, prompt, image_documents=None, **kwargs):
+        from llama_index.core.base.llms.types import CompletionResponse
+
+        self.requests += 1
+        # Batched prompts label their tables; single-table prompts are answered with one TableInfo
+        if "'Table <number>' label" in prompt or 'labelled Table' in prompt:
+            indexes = sorted({int(index) for index in re.findall(r'Table (\d+)', prompt)})
+            return CompletionResponse(text=json.dumps({'tables': [{**self.payload, 'index': index} for index in indexes]}))
+        return CompletionResponse(text=json.dumps(self.payload))
+
+
+class Benchmark:
+    """
+    Runs each pipeline stage against the bundled NVDA fixtures for a fixed
+    number of iterations and compares the results with a stored baseline.
+    """
+
+    def __init__(self, iterations: int = 3, threshold: float = 0.25, max_tables: int = 20) -> None:
+        """
+        Initialize the Benchmark class.
+
+        Args:
+            iterations (int): Number of timed runs per stage.
+            threshold (float): Allowed relative slowdown (or memory growth) before a stage counts as a regression.
+            max_tables (int): Number of tables fed to the per-table stages.
+        """
+        self.iterations = iterations
+        self.threshold = threshold
+        self.max_tables = max_tables
+        self.work_dir = Path(tempfile.mkdtemp(prefix='sec-bench-'))
+
+    def measure(self, func) -> dict:
+        """
+        Time a stage over the configured iterations and record its peak memory.
+
+        Memory is traced in a separate, untimed run so tracemalloc overhead
+        does not leak into the timings.
+
+        Args:
+            func (callable): The stage to measure, called without arguments.
+
+        Returns:
+            dict: Median/min/max seconds and peak traced memory in bytes.
+        """
+        timings = []
+        for _ in range(self.iterations):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+
+        tracemalloc.start()
+        try:
+            func()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        return {
+            'iterations': self.iterations,
+            'median_s': statistics.median(timings),
+            'min_s': min(timings),
+            'max_s': max(timings),
+            'peak_bytes': peak,
+        }
+
+    def measure_import_time(self, snippet: str) -> dict:
+        """
+        Run a snippet in a fresh interpreter under `-X importtime` and total
+        the self time of every module it imports.
+
+        Args:
+            snippet (str): Python source executed with `-c`.
+
+        Returns:
+            dict: Median/min/max import seconds and the number of modules imported.
+        """
+        timings = []
+        modules = 0
+        for _ in range(self.iterations):
+            completed = subprocess.run(
+                [sys.executable, '-X', 'importtime', '-c', snippet],
+                cwd=FIXTURE_DIR,
+                capture_output=True,
+                text=True,
+            )
+            if completed.returncode != 0:
+                stderr = [line for line in completed.stderr.strip().splitlines() if not line.startswith('import time:')]
+                raise RuntimeError(stderr[-1] if stderr else f"exited with status {completed.returncode}")
+            # Lines look like "import time:       123 |        456 |   package"; the first one is the header
+            rows = [line.split('|') for line in completed.stderr.splitlines() if line.startswith('import time:')][1:]
+            timings.append(sum(int(row[0].split(':')[1]) for row in rows) / 1e6)
+            modules = len(rows)
+
+        return {
+            'iterations': self.iterations,
+            'median_s': statistics.median(timings),
+            'min_s': min(timings),
+            'max_s': max(timings),
+            'modules': modules,
+        }
+
+    @cached_property
+    def html_parser(self):
+        from tools.html_parser import HTMLParser
+
+        return HTMLParser()
+
+    @cached_property
+    def tables(self) -> list:
+        return [str(table) for table in self.html_parser.get_tables(HTML_FIXTURE)][: self.max_tables]
+
+    @cached_property
+    def frames(self) -> list:
+        import pandas as pd
+
+        return self.convert_tables() + [pd.read_excel(UNITABLE_FIXTURE)]
+
+    @cached_property
+    def weasy(self):
+        from tools.weasy import Weasy
+
+        return Weasy()
+
+    @cached_property
+    def llm(self):
+        from tools.llama_index_multimodel import LlamaIndexMultiModel
+
+        return LlamaIndexMultiModel(llm=StubMultiModalLLM())
+
+    @cached_property
+    def table_objects(self) -> list:
+        return [self.llm.extract_table_from_text(table) for table in self.tables]
+
+    @cached_property
+    def postgres(self):
+        from tools.postgres import PostgresHelper
+
+        # In-memory SQLite stands in for Postgres
+        os.environ['POSTGRES_CONN_STRING'] = 'sqlite://'
+        postgres = PostgresHelper()
+        postgres.get_engine()
+        return postgres
+
+    def convert_tables(self) -> list:
+        import pandas as pd
+
+        frames = []
+        for table in self.tables:
+            try:
+                frames.append(pd.read_html(StringIO('<html>' + table + '</html>'))[0])
+            except ValueError:
+                continue
+        return frames
+
+    def stages(self) -> dict:
+        """
+        Describe every stage as the shared inputs it needs and the callable
+        to measure. Inputs are built on first use, outside the timings, so a
+        missing optional dependency only fails the stages that need it.
+
+        Returns:
+            dict: Stage name mapped to a (input attribute names, zero-argument callable) pair.
+        """
+
+        def render():
+            for index, table in enumerate(self.tables):
+                self.weasy.html_to_image(table, f'{self.work_dir}/{index}.png')
+                self.weasy.html_to_pdf(table, f'{self.work_dir}/{index}.pdf')
+
+        def pymupdf():
+            from tools.pymupdf_extractor import PYMuPDFExtractor
+
+            return PYMuPDFExtractor().process(str(PDF_FIXTURE))
+
+        def tabula():
+            from tools.tabula_extractor import TabulaExtractor
+
+            return TabulaExtractor().process(str(PDF_FIXTURE))
+
+        def llm_extract():
+            return [self.llm.extract_table_from_text(table) for table in self.tables]
+
+        def llm_batched_extract():
+            results = self.llm.extract_tables_from_text(dict(enumerate(self.tables)))
+            if [table_object.index for table_object in results] != list(range(len(self.tables))):
+                raise ValueError('batched extraction did not map every table back to its index')
+            return results
+
+        def llm_batched_image_extract():
+            results = self.llm.extract_tables_from_image(dict(enumerate(self.tables)), self.work_dir, self.weasy)
+            if [table_object.index for table_object in results] != list(range(len(self.tables))):
+                raise ValueError('batched image extraction did not map every table back to its index')
+            return results
+
+        load_runs = itertools.count()
+
+        def postgres_load():
+            # Every call writes new table names, since save_table_object refuses to overwrite
+            run = next(load_runs)
+            for index, table_object in enumerate(self.table_objects):
+                self.postgres.save_table_object(table_object.model_copy(update={'name': f'{table_object.name}_{run}_{index}'}))
+
+        return {
+            'html_parse': (('html_parser',), lambda: self.html_parser.get_tables(HTML_FIXTURE)),
+            'table_conversion': (('tables',), self.convert_tables),
+            'clean': (('frames',), lambda: [self.html_parser.clean(frame.copy()) for frame in self.frames]),
+            'render': (('tables', 'weasy'), render),
+            'pymupdf': ((), pymupdf),
+            'tabula': ((), tabula),
+            'llm_stub': (('tables', 'llm'), llm_extract),
+            'llm_batched_stub': (('tables', 'llm'), llm_batched_extract),
+            'llm_batched_image_stub': (('tables', 'llm', 'weasy'), llm_batched_image_extract),
+            'postgres_load': (('table_objects', 'postgres'), postgres_load),
+        }
+
+    def run(self, only=None) -> dict:
+        """
+        Run every stage (or the selected ones) and collect their measurements.
+
+        Args:
+            only (list, optional): Stage names to run; all stages when omitted.
+
+        Returns:
+            dict: Stage name mapped to its measurement, or to an error entry if the stage failed.
+        """
+        results = {}
+        for name, snippet in IMPORT_SCENARIOS.items():
+            if only and name not in only:
+                continue
+            print(f"Benchmarking stage: {name}")
+            try:
+                results[name] = self.measure_import_time(snippet)
+            except Exception as e:
+                print(f"Stage {name} failed: {e}")
+                results[name] = {'error': str(e)}
+
+        for name, (inputs, func) in self.stages().items():
+            if only and name not in only:
+                continue
+            print(f"Benchmarking stage: {name}")
+            try:
+                for attribute in inputs:
+                    getattr(self, attribute)
+                results[name] = self.measure(func)
+            except Exception as e:
+                print(f"Stage {name} failed: {e}")
+                results[name] = {'error': str(e)}
+        return results
+
+    def compare(self, results: dict, baseline: dict) -> list:
+        """
+        Compare fresh results against a baseline.
+
+        Args:
+            results (dict): Measurements returned by run().
+            baseline (dict): Previously saved measurements.
+
+        Returns:
+            list: Human-readable descriptions of every regression found.
+        """
+        regressions = []
+        for name, current in results.items():
+            previous = baseline.get(name)
+            if not previous or 'error' in previous:
+                continue
+            if 'error' in current:
+                regressions.append(f"{name}: failed ({current['error']}) but was measured in the baseline")
+                continue
+            for metric in ('median_s', 'peak_bytes', 'modules'):
+                if metric not in current or metric not in previous:
+                    continue
+                limit = previous[metric] * (1 + self.threshold)
+                if current[metric] > limit:
+                    regressions.append(f"{name}: {metric} {current[metric]:.4g} exceeds baseline {previous[metric]:.4g} by more than {self.threshold:.0%}")
+        return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark the SEC filings pipeline on the bundled NVDA fixtures.')
+    parser.add_argument('--iterations', type=int, default=3)
+    parser.add_argument('--threshold', type=float, default=0.25, help='allowed relative regression, e.g. 0.25 for 25%%')
+    parser.add_argument('--max-tables', type=int, default=20)
+    parser.add_argument('--baseline', default=str(DEFAULT_BASELINE))
+    parser.add_argument('--update-baseline', action='store_true', help='overwrite the baseline with this run')
+    parser.add_argument('--stage', action='append', dest='stages', help='run only this stage (repeatable)')
+    args = parser.parse_args(argv)
+
+    benchmark = Benchmark(args.iterations, args.threshold, args.max_tables)
+    results = benchmark.run(args.stages)
+    print(json.dumps(results, indent=2))
+
+    errors = [name for name, result in results.items() if 'error' in result]
+    for name in errors:
+        print(f"ERROR stage {name} failed: {results[name]['error']}")
+
+    baseline_path = Path(args.baseline)
+    if args.update_baseline or not baseline_path.exists():
+        if errors:
+            print(f"Not writing baseline to {baseline_path}: {len(errors)} stage(s) failed")
+            return 1
+        with open(baseline_path, 'w') as file:
+            json.dump(results, file, indent=2)
+        print(f"Baseline written to {baseline_path}")
+        return 0
+
+    with open(baseline_path) as file:
+        baseline = json.load(file)
+    regressions = benchmark.compare(results, baseline)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions or errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,18 +1,56 @@
-import json
-from io import StringIO
+import asyncio
+import os
+from functools import cached_property
 from pathlib import Path
 
-import pandas as pd
-from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 
 from tools.html_parser import HTMLParser
 from tools.llama_index_multimodel import LlamaIndexMultiModel
+from tools.pipeline import Pipeline, Stage
 from tools.pymupdf_extractor import PYMuPDFExtractor
 from tools.tabula_extractor import TabulaExtractor
 from tools.postgres import PostgresHelper
 from tools.weasy import Weasy
 
+
+def render_table(item: dict) -> dict:
+    """
+    Pipeline stage: convert a table's HTML to an image and a PDF. Runs in a
+    worker process, so it only uses what is passed in the item.
+
+    Args:
+        item (dict): Pipeline item with 'index', 'html', 'image_dir' and 'pdf_dir'.
+
+    Returns:
+        dict: The item with 'image_file_path' and 'pdf_file_path' added.
+    """
+    weasy = Weasy()
+    index = item['index']
+    item['image_file_path'] = weasy.html_to_image(item['html'], f"{item['image_dir']}/{index}.png")
+    item['pdf_file_path'] = weasy.html_to_pdf(item['html'], f"{item['pdf_dir']}/{index}.pdf")
+    return item
+
+
+def extract_pdf_tables(item: dict) -> dict:
+    """
+    Pipeline stage: extract the rendered PDF table with PyMuPDF and Tabula.
+    Runs in a worker process.
+
+    Args:
+        item (dict): Pipeline item with 'pdf_file_path'.
+
+    Returns:
+        dict: The item with 'pymupdf' and 'tabula' DataFrame lists added.
+    """
+    item['pymupdf'] = []
+    item['tabula'] = []
+    if item['pdf_file_path']:
+        item['pymupdf'] = PYMuPDFExtractor().process(item['pdf_file_path'])
+        item['tabula'] = TabulaExtractor().process(item['pdf_file_path'])
+    return item
+
+
 class Orchestrator:
     """
     A class to orchestrate the process of extracting tables from HTML files,
@@ -21,15 +59,32 @@ class Orchestrator:
     
     def __init__(self) -> None:
         """
-        Initialize the Orchestrator class and its dependencies.
+        Initialize the Orchestrator class. Tools are created lazily, on the
+        first stage that uses them, so an HTML-only or PDF-only run never
+        imports the LLM, rendering or database backends.
         """
         load_dotenv()
-        self.pymupdf = PYMuPDFExtractor()
-        self.tabula = TabulaExtractor()
         self.html_parser = HTMLParser()
-        self.llama_index_multi_model = LlamaIndexMultiModel()
-        self.postgres = PostgresHelper()
-        self.weasy = Weasy()
+
+    @cached_property
+    def pymupdf(self) -> PYMuPDFExtractor:
+        return PYMuPDFExtractor()
+
+    @cached_property
+    def tabula(self) -> TabulaExtractor:
+        return TabulaExtractor()
+
+    @cached_property
+    def llama_index_multi_model(self) -> LlamaIndexMultiModel:
+        return LlamaIndexMultiModel()
+
+    @cached_property
+    def postgres(self) -> PostgresHelper:
+        return PostgresHelper()
+
+    @cached_property
+    def weasy(self) -> Weasy:
+        return Weasy()
         
     def run(self, ticker: str, html_file_path: str) -> None:
         """
@@ -86,6 +141,103 @@ class Orchestrator:
 
         except Exception as e:
             print(f"An error occurred: {e}")
+
+    def run_pipeline(self, ticker: str, html_file_path: str, run_openai: bool = False, save_to_postgres: bool = False,
+                     workers: int = None, llm_workers: int = 4, queue_size: int = 8, report_interval: float = None, sink=None) -> list:
+        """
+        Run the orchestration non-interactively as a staged pipeline.
+
+        Rendering and PDF extraction run in process pools, while the OpenAI and
+        PostgreSQL stages run on the event loop, so CPU work continues during
+        LLM calls. Stages are connected by bounded queues that apply
+        backpressure; per-stage queue depth and throughput are available from
+        self.pipeline.stats().
+
+        Args:
+            ticker (str): The ticker symbol for the company.
+            html_file_path (str): The path to the HTML file containing tables.
+            run_openai (bool): Whether to extract every table with OpenAI.
+            save_to_postgres (bool): Whether to save the OpenAI output to PostgreSQL; requires run_openai.
+            workers (int, optional): Processes per CPU-bound stage; defaults to the CPU count.
+            llm_workers (int): Concurrent OpenAI requests.
+            queue_size (int): Capacity of each stage's input queue.
+            report_interval (float, optional): Seconds between printed stats reports while running.
+            sink (Callable, optional): Called with every fully processed item, including its HTML and
+                DataFrames. Without a sink only item summaries are kept.
+
+        Returns:
+            list: Summaries of the processed items, in completion order, without the table HTML and
+                with DataFrames replaced by their counts; empty when a sink is given.
+        """
+        workers = workers or os.cpu_count() or 1
+        stages = [
+            Stage('render', render_table, 'process', workers, queue_size),
+            Stage('pdf_extraction', extract_pdf_tables, 'process', workers, queue_size),
+        ]
+        if run_openai:
+            # Create the OpenAI client and database engine up front, since the lazy getters are not
+            # locked and the worker threads would otherwise race to build their own
+            self.llama_index_multi_model.llm
+            stages.append(Stage('openai', self._extract_with_openai, 'async', llm_workers, queue_size))
+            if save_to_postgres:
+                self.postgres.get_engine()
+                stages.append(Stage('postgres', self._save_to_postgres, 'async', 1, queue_size))
+
+        self.pipeline = Pipeline(stages, report_interval)
+        summaries = []
+
+        def collect_summary(item):
+            summaries.append(self._summarize_item(item))
+
+        with self.html_parser.get_table_records(html_file_path) as records:
+            self.pipeline.run(self._pipeline_items(ticker, records), sink or collect_summary)
+        return summaries
+
+    def _summarize_item(self, item: dict) -> dict:
+        """
+        Drop the heavy fields of a finished pipeline item so collecting every
+        table does not grow memory with filing size.
+        """
+        summary = {key: value for key, value in item.items() if key not in ('html', 'pymupdf', 'tabula')}
+        summary['pymupdf_tables'] = len(item.get('pymupdf', []))
+        summary['tabula_tables'] = len(item.get('tabula', []))
+        return summary
+
+    def _pipeline_items(self, ticker: str, records):
+        """
+        Yield one pipeline item per table, reading its HTML only when the
+        first stage has room for it.
+        """
+        for record in records:
+            image_dir = Path(f'./files/{ticker}/{record.index}/image')
+            image_dir.mkdir(exist_ok=True, parents=True)
+            pdf_dir = Path(f'./files/{ticker}/{record.index}/pdf')
+            pdf_dir.mkdir(exist_ok=True, parents=True)
+            yield {
+                'index': record.index,
+                'html': records.read_html(record),
+                'caption': record.caption,
+                'image_dir': str(image_dir),
+                'pdf_dir': str(pdf_dir),
+            }
+
+    async def _extract_with_openai(self, item: dict) -> dict:
+        """
+        Pipeline stage: extract the rendered table image with OpenAI.
+        """
+        if item['image_file_path']:
+            item['table_object'] = await asyncio.to_thread(
+                self.llama_index_multi_model.extract_table_from_image, item['image_dir'], item['caption']
+            )
+        return item
+
+    async def _save_to_postgres(self, item: dict) -> dict:
+        """
+        Pipeline stage: save the OpenAI output to PostgreSQL.
+        """
+        if item.get('table_object'):
+            await asyncio.to_thread(self.postgres.save_table_object, item['table_object'])
+        return item
             
 if __name__ == "__main__":
     orchestrator = Orchestrator()
@@ -1,8 +1,5 @@
-import json
-from io import StringIO
-
-import pandas as pd
-from bs4 import BeautifulSoup
+from functools import cached_property
+from pathlib import Path
 
 from tools.html_parser import HTMLParser
 from tools.llama_index_multimodel import LlamaIndexMultiModel
@@ -12,8 +9,6 @@ from tools.postgres import PostgresHelper
 from tools.weasy import Weasy
 from dotenv import load_dotenv
 
-from pathlib import Path
-
 
 class Orchestrator:
     """
@@ -23,15 +18,32 @@ class Orchestrator:
     
     def __init__(self) -> None:
         """
-        Initialize the Orchestrator class and its dependencies.
+        Initialize the Orchestrator class. Tools are created lazily, on the
+        first stage that uses them, so an HTML-only or PDF-only run never
+        imports the LLM, rendering or database backends.
         """
         load_dotenv()
-        self.pymupdf = PYMuPDFExtractor()
-        self.tabula = TabulaExtractor()
         self.html_parser = HTMLParser()
-        self.llama_index_multi_model = LlamaIndexMultiModel()
-        self.postgres = PostgresHelper()
-        self.weasy = Weasy()
+
+    @cached_property
+    def pymupdf(self) -> PYMuPDFExtractor:
+        return PYMuPDFExtractor()
+
+    @cached_property
+    def tabula(self) -> TabulaExtractor:
+        return TabulaExtractor()
+
+    @cached_property
+    def llama_index_multi_model(self) -> LlamaIndexMultiModel:
+        return LlamaIndexMultiModel()
+
+    @cached_property
+    def postgres(self) -> PostgresHelper:
+        return PostgresHelper()
+
+    @cached_property
+    def weasy(self) -> Weasy:
+        return Weasy()
         
     def run(self, ticker: str, html_file_path: str) -> None:
         """
@@ -42,53 +54,54 @@ class Orchestrator:
             html_file_path (str): The path to the HTML file containing tables.
         """
         marker = int(input("Enter an index to pause? "))
-        data = self.html_parser.get_tables_sibling_content(html_file_path)
-
-        # Loop through each table
-        for index, table in enumerate(data):
-            sibling_content = data[table]
-            image_dir = Path(f'./files/{ticker}/{index}/image')
-            image_dir.mkdir(exist_ok=True, parents=True)
-            pdf_dir = Path(f'./files/{ticker}/{index}/pdf')
-            pdf_dir.mkdir(exist_ok=True, parents=True)
-            print(f"Processing Table Index: {index}")
-            print(f"Sibling Content: {sibling_content}")
+        with self.html_parser.get_table_records(html_file_path) as records:
+            # Loop through each table
+            for record in records:
+                index = record.index
+                table = records.read_html(record)
+                sibling_content = record.caption
+                image_dir = Path(f'./files/{ticker}/{index}/image')
+                image_dir.mkdir(exist_ok=True, parents=True)
+                pdf_dir = Path(f'./files/{ticker}/{index}/pdf')
+                pdf_dir.mkdir(exist_ok=True, parents=True)
+                print(f"Processing Table Index: {index}")
+                print(f"Sibling Content: {sibling_content}")
             
-            # Convert HTML to PDF and image
-            image_file_path = self.weasy.html_to_image(table, f'{image_dir}/{index}.png')
-            pdf_file_path = self.weasy.html_to_pdf(table, f'{pdf_dir}/{index}.pdf')
+                # Convert HTML to PDF and image
+                image_file_path = self.weasy.html_to_image(table, f'{image_dir}/{index}.png')
+                pdf_file_path = self.weasy.html_to_pdf(table, f'{pdf_dir}/{index}.pdf')
             
-            # TODO: Process image with unitable
-            # unitable_response = self.unitable.process(image_file_path)
+                # TODO: Process image with unitable
+                # unitable_response = self.unitable.process(image_file_path)
             
-            # Process PDF with PYMuPDF
-            pymupdf_response = self.pymupdf.process(pdf_file_path)
-            if pymupdf_response:
-                print(f"PYMuPDF Output: \n{pymupdf_response[0].to_string(index=False)}")
+                # Process PDF with PYMuPDF
+                pymupdf_response = self.pymupdf.process(pdf_file_path)
+                if pymupdf_response:
+                    print(f"PYMuPDF Output: \n{pymupdf_response[0].to_string(index=False)}")
 
-            # Process PDF with Tabula
-            tabula_response = self.tabula.process(pdf_file_path)
-            if tabula_response:
-                print(f"Tabula Output: \n{tabula_response[0].to_string(index=False)}")
+                # Process PDF with Tabula
+                tabula_response = self.tabula.process(pdf_file_path)
+                if tabula_response:
+                    print(f"Tabula Output: \n{tabula_response[0].to_string(index=False)}")
             
-            # Pause at specified marker index
-            if index == marker:
-                user_input = input("Enter an index to pause or press Enter to continue: ")
-                if not user_input:
-                    marker = index + 1
-                else:
-                    marker = int(user_input)
+                # Pause at specified marker index
+                if index == marker:
+                    user_input = input("Enter an index to pause or press Enter to continue: ")
+                    if not user_input:
+                        marker = index + 1
+                    else:
+                        marker = int(user_input)
             
-                # Ask for OpenAI processing
-                run_openai = input("Run OpenAI for this table? [Y/n]: ")
-                if run_openai.lower() == 'y':
-                    table_object = self.llama_index_multi_model.extract_table_from_image(image_dir, sibling_content)
-                    print(">>> OpenAI processed table_object:", table_object)
+                    # Ask for OpenAI processing
+                    run_openai = input("Run OpenAI for this table? [Y/n]: ")
+                    if run_openai.lower() == 'y':
+                        table_object = self.llama_index_multi_model.extract_table_from_image(image_dir, sibling_content)
+                        print(">>> OpenAI processed table_object:", table_object)
 
-                    # Ask to save to PostgreSQL
-                    save_to_postgres = input("Do you want to save this to PostgreSQL? [Y/n]: ")
-                    if save_to_postgres.lower() == 'y':
-                        self.postgres.save_table_object(table_object)
+                        # Ask to save to PostgreSQL
+                        save_to_postgres = input("Do you want to save this to PostgreSQL? [Y/n]: ")
+                        if save_to_postgres.lower() == 'y':
+                            self.postgres.save_table_object(table_object)
                         
 if __name__ == "__main__": 
     orchestrator = Orchestrator()
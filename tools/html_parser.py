@@ -1,5 +1,27 @@
-from bs4 import BeautifulSoup
-import pandas as pd
+from io import StringIO
+
+from bs4 import BeautifulSoup, Tag
+
+from tools.submission_reader import SubmissionReader
+from tools.table_store import TableRecord, TableStore
+
+
+class _WindowSoup(BeautifulSoup):
+    """
+    BeautifulSoup for a window cut out of a larger document. Records how many
+    top-level nodes precede the last end tag that matched no open element,
+    i.e. that closes an element opened before the window.
+    """
+
+    def reset(self):
+        super().reset()
+        self.cut_before = 0
+
+    def handle_endtag(self, name, nsprefix=None):
+        current = self.currentTag
+        super().handle_endtag(name, nsprefix)
+        if self.currentTag is current:
+            self.cut_before = len(self.contents)
 
 
 class HTMLParser:
@@ -8,19 +30,21 @@ class HTMLParser:
     """
 
     def __init__(self):
-        pass
+        self.submission_reader = SubmissionReader()
 
     def clean(self, table):
         """
-        Cleans a single HTML table element.
+        Cleans a single table parsed from HTML.
 
         Args:
-            table (bs4.element.Tag): The table element to clean.
+            table (pandas.DataFrame): The table to clean.
 
         Returns:
             pandas.DataFrame: The cleaned table data as a DataFrame.
         """
-        df.dropna(how='all', inplace=True)
+        import pandas as pd
+
+        table.dropna(how='all', inplace=True)
         
         # Check for columns with NaN headers and drop them if all values in that column are NaN
         columns_to_drop = [col for col in table.columns if pd.isna(col) and table[col].isna().all()]
@@ -95,13 +119,15 @@ class HTMLParser:
         Returns:
             list: A list of pandas.DataFrame objects representing the cleaned tables.
         """
+        import pandas as pd
+
         cleaned_tables = []
         tables = self.get_tables(html_path)
 
         # Clean each table and append to the list
         for table in tables:
             try:
-                df = pd.read_html('<html>'+table+'</html>')
+                df = pd.read_html(StringIO('<html>'+str(table)+'</html>'))[0]
                 cleaned_df = self.clean(df)
                 cleaned_tables.append(cleaned_df)
             except:
@@ -135,21 +161,84 @@ class HTMLParser:
         return content
             
 
+    def get_table_records(self, html_path, memory_budget=None, caption_window=4096):
+        """
+        Extracts all tables from an HTML file as compact TableRecord objects
+        holding the table's byte range, index and sibling content as caption.
+
+        Unlike get_tables_sibling_content, only a window of HTML before each
+        table is parsed to find its caption, and no tree is kept alive.
+
+        Args:
+            html_path (str): Path to the HTML file or submission text file.
+            memory_budget (int, optional): Bytes of records kept in memory before spilling to disk; None never spills.
+            caption_window (int): Initial number of bytes before each table searched for its caption; doubled until it is large enough.
+
+        Returns:
+            TableStore: The records, iterable in table order.
+        """
+        store = TableStore(html_path, memory_budget)
+        for index, (start, end, get_preceding) in enumerate(self.submission_reader.iter_table_ranges(html_path)):
+            store.add(TableRecord(index, start, end, self._get_caption(get_preceding, caption_window)))
+        return store
+
+    def _get_caption(self, get_preceding, window):
+        """
+        Finds the text of the element before a table's parent, as
+        get_tables_sibling_content does, from the HTML that precedes the table.
+
+        The window is doubled until the parent's previous sibling is known to
+        lie wholly inside it, so text is never taken from a cut element.
+        """
+        while True:
+            preceding_html, complete = get_preceding(window)
+            soup = _WindowSoup(preceding_html + '<table></table>', "html.parser")
+            parent = soup.find_all('table')[-1].parent
+            sibling = parent.previous_sibling if parent is not soup else None
+            if complete or self._is_whole_sibling(soup, parent, sibling):
+                return sibling.get_text() if sibling else None
+            window *= 2
+
+    def _is_whole_sibling(self, soup, parent, sibling):
+        """
+        Whether the window parse of a table's parent and its previous sibling
+        matches the whole document.
+        """
+        if parent is soup:
+            return False
+        # The parent's parent opened inside the window, so all of its children did too
+        if parent.parent is not soup:
+            return True
+        if sibling is None:
+            # The real previous sibling may start before the window
+            return False
+        position = soup.contents.index(sibling)
+        if position < soup.cut_before:
+            # An end tag for an element opened before the window follows it, so it is part of that element
+            return False
+        # A tag opened inside the window is whole; text is whole unless it may start before the window
+        return soup.cut_before > 0 or position > 0 or isinstance(sibling, Tag)
+
     def get_tables(self, html_path):
         """
-        Extracts all tables from an HTML file and returns them as html table tags <table>.
+        Extracts all tables from an HTML file or a full submission text file
+        and returns them as html table tags <table>.
+
+        The file is memory-mapped and only the <table> regions are handed to
+        BeautifulSoup, so large submissions are never parsed as a whole.
+        Nested tables are returned as entries of their own, after their
+        parent, as find_all('table') does.
 
         Args:
-            html_path (str): Path to the HTML file.
+            html_path (str): Path to the HTML file or submission text file.
 
         Returns:
             list: A list of  html table tag <table> objects representing the cleaned tables.
         """        
-        with open(html_path, 'r') as f:
-            soup = BeautifulSoup(f, "html.parser")
-
-        # Find all table elements
-        tables = soup.find_all('table')
+        tables = []
+        for table_html in self.submission_reader.iter_tables(html_path):
+            if table := BeautifulSoup(table_html, "html.parser").find('table'):
+                tables.append(table)
         return tables
 
 if __name__ == "__main__":
@@ -1,17 +1,45 @@
 import os
-from typing import Dict, List
+import re
+from pathlib import Path
+from typing import Dict, List, Optional
 
 from dotenv import load_dotenv
-from llama_index.core import SimpleDirectoryReader
-from llama_index.core.output_parsers import PydanticOutputParser
-from llama_index.core.program import MultiModalLLMCompletionProgram
-from llama_index.multi_modal_llms.openai import OpenAIMultiModal
 from pydantic import BaseModel, Field
 
 load_dotenv()
 
 import base64
 
+# Wrappers that only carry styling; their text is kept. Block tags become a space so stacked lines stay apart
+BLOCK_TAG_PATTERN = re.compile(r'</?(?:div|p|br)\b[^>]*>', re.IGNORECASE)
+INLINE_TAG_PATTERN = re.compile(r'</?(?:span|font|b|i|u|a|ix:\w+)\b[^>]*>', re.IGNORECASE)
+TAG_PATTERN = re.compile(r'<(\w+)\b([^>]*?)(/?)>')
+SPAN_ATTRIBUTE_PATTERN = re.compile(r'\b(?:colspan|rowspan)\s*=\s*"?\d+"?', re.IGNORECASE)
+
+def compact_table_html(table_str: str) -> str:
+    """
+    Strip styling from table HTML, keeping only the table tags, their
+    colspan/rowspan and the text. Filing tables shrink about ten-fold.
+    Strings without tags, such as pandas to_string output, are returned
+    unchanged so their column alignment survives.
+
+    Args:
+        table_str (str): HTML of a table.
+
+    Returns:
+        str: The compacted HTML.
+    """
+    def keep_spans(match):
+        attributes = ' '.join(SPAN_ATTRIBUTE_PATTERN.findall(match.group(2)))
+        return f"<{match.group(1)}{' ' + attributes if attributes else ''}{match.group(3)}>"
+
+    if not TAG_PATTERN.search(table_str):
+        return table_str
+    table_str = BLOCK_TAG_PATTERN.sub(' ', table_str)
+    table_str = INLINE_TAG_PATTERN.sub('', table_str)
+    table_str = TAG_PATTERN.sub(keep_spans, table_str)
+    return re.sub(r'\s+', ' ', table_str).strip()
+
 class TableInfo(BaseModel):
     """Information regarding a structured table."""
 
@@ -30,15 +58,68 @@ class TableInfo(BaseModel):
         ..., description="The data of the table in list of dicts format"
     )
 
+class IndexedTableInfo(TableInfo):
+    """Information regarding a structured table and its position in the filing."""
+
+    index: int = Field(
+        ..., description="the number from the 'Table <number>' label of the table"
+    )
+
+class TableInfoBatch(BaseModel):
+    """Information regarding several structured tables."""
+
+    tables: List[IndexedTableInfo] = Field(
+        ..., description="one entry per labelled table, in the order they appear"
+    )
+
 class LlamaIndexMultiModel:
     
-    def __init__(self):    
-        OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
-        self.llm = OpenAIMultiModal(
-            model="gpt-4o", api_key=OPENAI_API_KEY, max_new_tokens=1000
-        )
+    def __init__(self, llm=None, max_new_tokens=1000, max_batch_tokens=4096):    
+        """
+        Args:
+            llm (MultiModalLLM, optional): Model to use instead of OpenAI gpt-4o, e.g. an offline stub.
+            max_new_tokens (int): Completion token limit for single-table requests to the default OpenAI model.
+            max_batch_tokens (int): Completion token limit for batched requests; batches are sized to fit it.
+        """
+        self.api_key = os.getenv('OPENAI_API_KEY')
+        self.max_new_tokens = max_new_tokens
+        self.max_batch_tokens = max_batch_tokens
+        self._llm = llm
+        self._batch_llm = llm
+        self.failed_indexes = []
+
+    @property
+    def llm(self):
+        """
+        The OpenAI multi-modal client, created on first use so that importing
+        this module does not pull in llama_index or openai.
+        """
+        if self._llm is None:
+            from llama_index.multi_modal_llms.openai import OpenAIMultiModal
+
+            self._llm = OpenAIMultiModal(
+                model="gpt-4o", api_key=self.api_key, max_new_tokens=self.max_new_tokens
+            )
+        return self._llm
+
+    @property
+    def batch_llm(self):
+        """
+        The OpenAI multi-modal client for batched requests, allowed
+        max_batch_tokens of output so a full batch is not cut off.
+        """
+        if self._batch_llm is None:
+            from llama_index.multi_modal_llms.openai import OpenAIMultiModal
+
+            self._batch_llm = OpenAIMultiModal(
+                model="gpt-4o", api_key=self.api_key, max_new_tokens=self.max_batch_tokens
+            )
+        return self._batch_llm
 
     def extract_table_from_image(self, image_dir, sibling_content=None):
+        from llama_index.core import SimpleDirectoryReader
+        from llama_index.core.output_parsers import PydanticOutputParser
+        from llama_index.core.program import MultiModalLLMCompletionProgram
 
         image_documents = SimpleDirectoryReader(image_dir).load_data()
         sibling_text =  f"and here is sibling content: {sibling_content}" if sibling_content else ""
@@ -63,6 +144,9 @@ class LlamaIndexMultiModel:
         return response
 
     def extract_table_from_text(self, table_str):
+        from llama_index.core.output_parsers import PydanticOutputParser
+        from llama_index.core.program import MultiModalLLMCompletionProgram
+
         prompt_template_str = f"""Please review the following data which has a table and the same table in pandas to_string
                     
                                 Table string:
@@ -84,3 +168,182 @@ class LlamaIndexMultiModel:
 
         response = openai_program()
         return response
+
+    def estimate_output_tokens(self, table_str: str) -> int:
+        """
+        Rough, deliberately generous estimate of the completion tokens needed
+        to return one table as JSON: the data repeats column names per row,
+        so it is sized on the compacted table rather than its text alone.
+        """
+        return len(compact_table_html(table_str)) // 3 + 100
+
+    def batch_tables(self, tables: Dict[int, str], max_chars=8000, max_tables=8, max_output_tokens=None) -> List[Dict[int, str]]:
+        """
+        Groups small tables into batches for a single request each. Sizes are
+        measured on compact_table_html, since raw filing HTML is mostly inline
+        styling. A table larger than the limits gets a batch of its own.
+
+        Args:
+            tables (Dict[int, str]): Table strings keyed by table index.
+            max_chars (int): Maximum combined compacted length of the tables in one batch.
+            max_tables (int): Maximum number of tables in one batch.
+            max_output_tokens (int, optional): Maximum combined estimate_output_tokens of one batch;
+                defaults to max_batch_tokens.
+
+        Returns:
+            List[Dict[int, str]]: The batches, preserving table order.
+        """
+        max_output_tokens = max_output_tokens or self.max_batch_tokens
+        batches = []
+        batch, batch_chars, batch_tokens = {}, 0, 0
+        for index, table_str in tables.items():
+            size = len(compact_table_html(table_str))
+            tokens = self.estimate_output_tokens(table_str)
+            if batch and (batch_chars + size > max_chars or batch_tokens + tokens > max_output_tokens or len(batch) >= max_tables):
+                batches.append(batch)
+                batch, batch_chars, batch_tokens = {}, 0, 0
+            batch[index] = table_str
+            batch_chars += size
+            batch_tokens += tokens
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def _run_batch(self, prompt_template_str, indexes, image_documents=None) -> Dict[int, IndexedTableInfo]:
+        """
+        Runs one batched request and keeps only the tables whose index was
+        requested. A failed request or unparseable (e.g. cut-off) response
+        yields no tables, leaving the whole batch to the per-table fallback.
+        """
+        from llama_index.core.output_parsers import PydanticOutputParser
+        from llama_index.core.program import MultiModalLLMCompletionProgram
+
+        openai_program = MultiModalLLMCompletionProgram.from_defaults(
+            output_parser=PydanticOutputParser(TableInfoBatch),
+            image_documents=image_documents or [],
+            prompt_template_str=prompt_template_str,
+            multi_modal_llm=self.batch_llm,
+            verbose=True,
+        )
+
+        try:
+            response = openai_program()
+        except Exception as e:
+            print(f"Batched request for tables {indexes} failed: {e}")
+            return {}
+        return {table.index: table for table in response.tables if table.index in indexes}
+
+    def _extract_single(self, index, table_str, image_dir=None, weasy=None) -> Optional[IndexedTableInfo]:
+        """
+        Extracts one table a batch did not return, as text or, when a
+        renderer is given, from its own image.
+        """
+        try:
+            if weasy is None:
+                # Escape braces so table content is not read as template variables
+                response = self.extract_table_from_text(compact_table_html(table_str).replace('{', '{{').replace('}', '}}'))
+            else:
+                table_dir = Path(image_dir) / f'table_{index}'
+                table_dir.mkdir(exist_ok=True, parents=True)
+                if not weasy.html_to_image(table_str, f'{table_dir}/{index}.png'):
+                    raise ValueError("rendering the table image failed")
+                response = self.extract_table_from_image(table_dir)
+            return IndexedTableInfo(index=index, **response.model_dump())
+        except Exception as e:
+            print(f"Error extracting table {index}: {e}")
+            return None
+
+    def _collect_batch(self, batch, returned, image_dir=None, weasy=None) -> List[IndexedTableInfo]:
+        """
+        Orders a batch's results by table index, retrying the tables the
+        batch did not return one at a time and recording those that still fail.
+        """
+        missing = [index for index in batch if index not in returned]
+        if missing:
+            print(f"Tables {missing} missing from batched response, retrying one table at a time")
+
+        results = []
+        for index, table_str in batch.items():
+            table = returned.get(index) or self._extract_single(index, table_str, image_dir, weasy)
+            if table:
+                results.append(table)
+            else:
+                self.failed_indexes.append(index)
+        return results
+
+    def extract_tables_from_text(self, tables: Dict[int, str], max_chars=8000, max_tables=8) -> List[IndexedTableInfo]:
+        """
+        Batched version of extract_table_from_text: packs several tables,
+        labelled with their index and compacted with compact_table_html,
+        into each request. Tables a batch does not return are retried one at
+        a time.
+
+        Args:
+            tables (Dict[int, str]): Table strings keyed by table index.
+            max_chars (int): Maximum combined compacted length of the tables in one request.
+            max_tables (int): Maximum number of tables in one request.
+
+        Returns:
+            List[IndexedTableInfo]: One entry per extracted table, carrying its table index. Indexes of
+                tables that could not be extracted are left in self.failed_indexes.
+        """
+        self.failed_indexes = []
+        results = []
+        for batch in self.batch_tables(tables, max_chars, max_tables):
+            # Escape braces so table content is not read as template variables
+            table_blocks = "\n\n".join(
+                f"Table {index}:\n{compact_table_html(table_str)}".replace('{', '{{').replace('}', '}}') for index, table_str in batch.items()
+            )
+            prompt_template_str = f"""Please review the following {len(batch)} tables, each preceded by a 'Table <number>' label
+
+                                {table_blocks}
+
+                                For each table fix the table structure and misalignment of column where in some columns are split into two while parsing the data
+                                There might be column names that are spread across multiple rows in the table.
+
+                                Return one entry per table with its label number as index, and DO NOT include any addional information
+
+                                Always return the response in json format
+                            """
+            returned = self._run_batch(prompt_template_str, list(batch))
+            results.extend(self._collect_batch(batch, returned))
+        return results
+
+    def extract_tables_from_image(self, tables: Dict[int, str], image_dir, weasy, max_chars=8000, max_tables=8) -> List[IndexedTableInfo]:
+        """
+        Batched version of extract_table_from_image: renders several labelled
+        tables into one tiled image per request with Weasy. Tables a batch
+        does not return, including whole batches whose image failed to
+        render, are retried one at a time from their own image.
+
+        Args:
+            tables (Dict[int, str]): Table HTML keyed by table index.
+            image_dir (str): Directory the tiled images are written to.
+            weasy (Weasy): Renderer used to produce the tiled images.
+            max_chars (int): Maximum combined compacted HTML length of the tables in one image.
+            max_tables (int): Maximum number of tables in one image.
+
+        Returns:
+            List[IndexedTableInfo]: One entry per extracted table, carrying its table index. Indexes of
+                tables that could not be extracted are left in self.failed_indexes.
+        """
+        from llama_index.core import SimpleDirectoryReader
+
+        self.failed_indexes = []
+        results = []
+        for batch in self.batch_tables(tables, max_chars, max_tables):
+            indexes = list(batch)
+            returned = {}
+            image_file_path = weasy.html_tables_to_image(batch, f'{image_dir}/batch_{indexes[0]}_{indexes[-1]}.png')
+            if image_file_path:
+                image_documents = SimpleDirectoryReader(input_files=[image_file_path]).load_data()
+                labels = ", ".join(f"Table {index}" for index in indexes)
+                prompt_template_str = f"""Please review the image carefully which has {len(batch)} tables, labelled {labels}
+                                There might be column names that are spread across multiple rows in the tables and please standardize the multi level column names by giving renaming in a meaningful way 
+                                return one entry per table with its label number as index and the table data with json format
+                            """
+                returned = self._run_batch(prompt_template_str, indexes, image_documents)
+            else:
+                print(f"Rendering the tiled image for tables {indexes} failed")
+            results.extend(self._collect_batch(batch, returned, image_dir, weasy))
+        return results
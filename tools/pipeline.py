@@ -0,0 +1,202 @@
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Iterable, List, Optional
+
+
+class Stage:
+    """
+    One step of a Pipeline: a function applied to every item, run by its own
+    pool of workers and fed through a bounded queue.
+
+    The executor decides where the work runs:
+        - 'process': a ProcessPoolExecutor, for CPU-bound work (func and items must be picklable)
+        - 'thread': a ThreadPoolExecutor, for blocking I/O
+        - 'async': func is a coroutine function awaited on the event loop
+
+    Returning None from func drops the item.
+    """
+
+    def __init__(self, name: str, func: Callable, executor: str = 'thread', workers: int = 1, queue_size: int = 8) -> None:
+        """
+        Initialize the Stage class.
+
+        Args:
+            name (str): Name used in the stats.
+            func (Callable): Function applied to each item.
+            executor (str): One of 'process', 'thread' or 'async'.
+            workers (int): Number of items processed concurrently.
+            queue_size (int): Capacity of the stage's input queue; a full queue blocks the previous stage.
+        """
+        if executor not in ('process', 'thread', 'async'):
+            raise ValueError(f"Unknown executor {executor!r}")
+        self.name = name
+        self.func = func
+        self.executor = executor
+        self.workers = workers
+        self.queue_size = queue_size
+        self.queue = None
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Clear the counters before a new run.
+        """
+        self.processed = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self.first_start = None
+        self.last_finish = None
+
+    def stats(self) -> dict:
+        """
+        Current queue depth and throughput of the stage.
+
+        Returns:
+            dict: queue_depth, processed, errors, busy_seconds and throughput in items per second.
+        """
+        elapsed = (self.last_finish - self.first_start) if self.first_start and self.last_finish else 0.0
+        return {
+            'queue_depth': self.queue.qsize() if self.queue else 0,
+            'processed': self.processed,
+            'errors': self.errors,
+            'busy_seconds': self.busy_seconds,
+            'throughput': self.processed / elapsed if elapsed else 0.0,
+        }
+
+
+class Pipeline:
+    """
+    Runs items through a chain of stages concurrently. Every stage has its
+    own worker pool and bounded input queue, so CPU-bound stages keep working
+    while network or database stages wait, and a slow stage applies
+    backpressure instead of letting work pile up in memory.
+    """
+
+    def __init__(self, stages: List[Stage], report_interval: Optional[float] = None) -> None:
+        """
+        Initialize the Pipeline class.
+
+        Args:
+            stages (List[Stage]): The stages, in processing order.
+            report_interval (float, optional): Seconds between printed stats reports while running.
+        """
+        self.stages = stages
+        self.report_interval = report_interval
+
+    def stats(self) -> dict:
+        """
+        Per-stage queue depth and throughput; safe to call while running.
+
+        Returns:
+            dict: Stage name mapped to its stats.
+        """
+        return {stage.name: stage.stats() for stage in self.stages}
+
+    async def _call(self, stage: Stage, pool, item):
+        if stage.executor == 'async':
+            return await stage.func(item)
+        return await asyncio.get_running_loop().run_in_executor(pool, stage.func, item)
+
+    async def _worker(self, stage: Stage, pool, next_queue: Optional[asyncio.Queue], sink: Callable) -> None:
+        while True:
+            item = await stage.queue.get()
+            try:
+                start = time.perf_counter()
+                stage.first_start = stage.first_start or start
+                result = None
+                try:
+                    result = await self._call(stage, pool, item)
+                    stage.processed += 1
+                except Exception as e:
+                    stage.errors += 1
+                    print(f"Error in stage {stage.name}: {e}")
+                # Stop the clock before handing on, so time blocked on a full downstream queue is not counted
+                stage.last_finish = time.perf_counter()
+                stage.busy_seconds += stage.last_finish - start
+
+                if result is not None:
+                    try:
+                        if next_queue is not None:
+                            await next_queue.put(result)
+                        else:
+                            sink(result)
+                    except Exception as e:
+                        stage.errors += 1
+                        print(f"Error handing off from stage {stage.name}: {e}")
+            finally:
+                stage.queue.task_done()
+
+    async def _report(self) -> None:
+        while True:
+            await asyncio.sleep(self.report_interval)
+            for name, stats in self.stats().items():
+                print(f"[{name}] queue={stats['queue_depth']} processed={stats['processed']} errors={stats['errors']} throughput={stats['throughput']:.2f}/s")
+
+    async def _drain(self, items: Iterable) -> None:
+        for item in items:
+            await self.stages[0].queue.put(item)
+        # A stage's queue is drained only once its outputs are queued downstream, so joining in order is enough
+        for stage in self.stages:
+            await stage.queue.join()
+
+    async def run_async(self, items: Iterable, sink: Optional[Callable] = None) -> list:
+        """
+        Feed items into the first stage and wait until every stage has drained.
+        Errors raised by a stage's function or while handing its output on are
+        counted in the stage's stats; anything else that stops a worker is raised.
+
+        Args:
+            items (Iterable): Inputs of the first stage.
+            sink (Callable, optional): Called with each output of the last stage instead of collecting
+                them, so memory does not grow with the number of items.
+
+        Returns:
+            list: Outputs of the last stage, in completion order; empty when a sink is given.
+        """
+        results = []
+        sink = sink or results.append
+        pools = {}
+        tasks = []
+        for stage in self.stages:
+            stage.reset()
+            stage.queue = asyncio.Queue(maxsize=stage.queue_size)
+            if stage.executor == 'process':
+                pools[stage.name] = ProcessPoolExecutor(max_workers=stage.workers)
+            elif stage.executor == 'thread':
+                pools[stage.name] = ThreadPoolExecutor(max_workers=stage.workers)
+
+        try:
+            for position, stage in enumerate(self.stages):
+                next_queue = self.stages[position + 1].queue if position + 1 < len(self.stages) else None
+                for _ in range(stage.workers):
+                    tasks.append(asyncio.create_task(self._worker(stage, pools.get(stage.name), next_queue, sink)))
+            if self.report_interval:
+                tasks.append(asyncio.create_task(self._report()))
+
+            # Workers and the reporter only stop by raising, so wait on them too rather than hang on a dead worker
+            draining = asyncio.create_task(self._drain(items))
+            tasks.append(draining)
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                task.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for pool in pools.values():
+                pool.shutdown()
+        return results
+
+    def run(self, items: Iterable, sink: Optional[Callable] = None) -> list:
+        """
+        Blocking wrapper around run_async.
+
+        Args:
+            items (Iterable): Inputs of the first stage.
+            sink (Callable, optional): Called with each output of the last stage instead of collecting them.
+
+        Returns:
+            list: Outputs of the last stage, in completion order; empty when a sink is given.
+        """
+        return asyncio.run(self.run_async(items, sink))
@@ -1,12 +1,13 @@
 import os
 import re
 import json
+from typing import TYPE_CHECKING
 
-import pandas as pd
-from sqlalchemy import create_engine
-from sqlalchemy.exc import SQLAlchemyError
 from dotenv import load_dotenv
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 
 class PostgresHelper:
     """
@@ -15,14 +16,14 @@ class PostgresHelper:
     
     def __init__(self) -> None:
         """
-        Initialize the PostgresHelper class by loading environment variables
-        and creating a SQLAlchemy engine.
+        Initialize the PostgresHelper class by loading environment variables.
+        The SQLAlchemy engine is created on first use.
         """
         load_dotenv()
         self.conn_string = os.getenv('POSTGRES_CONN_STRING')
         if not self.conn_string:
             raise ValueError("POSTGRES_CONN_STRING environment variable not set")
-        self.engine = create_engine(self.conn_string)
+        self.engine = None
         
     def get_engine(self):
         """
@@ -32,10 +33,12 @@ class PostgresHelper:
             engine (Engine): SQLAlchemy engine.
         """
         if not self.engine:
+            from sqlalchemy import create_engine
+
             self.engine = create_engine(self.conn_string)
         return self.engine
 
-    def create_table_from_dataframe(self, df: pd.DataFrame, table_name: str):
+    def create_table_from_dataframe(self, df: 'pd.DataFrame', table_name: str):
         """
         Create a table in the database from a DataFrame.
         
@@ -46,13 +49,15 @@ class PostgresHelper:
         Raises:
             SQLAlchemyError: If there is an error creating the table.
         """
+        from sqlalchemy.exc import SQLAlchemyError
+
         try:
             # Sanitize column names
             sanitized_columns = {col: re.sub(r"\W+", "_", col) for col in df.columns}
             df = df.rename(columns=sanitized_columns)
             
             # Create table from DataFrame
-            df.to_sql(table_name, self.engine, if_exists='fail', index=False)
+            df.to_sql(table_name, self.get_engine(), if_exists='fail', index=False)
             print(f"Table {table_name} created successfully.")
         except SQLAlchemyError as e:
             print(f"Error creating table {table_name}: {e}")
@@ -64,12 +69,16 @@ class PostgresHelper:
         Args:
             table (object): An object with 'name' and 'data' attributes.
         """
+        import pandas as pd
+
         table_name = table.name
         df = pd.DataFrame(table.data)
         self.create_table_from_dataframe(df, table_name)
         
 
 if __name__ == "__main__":
+    import pandas as pd
+
     postgres = PostgresHelper()
     
     try:
@@ -1,4 +1,3 @@
-import pymupdf
 import re
 from tools.base import BaseClass
 
@@ -40,6 +39,8 @@ class PYMuPDFExtractor(BaseClass):
         Returns:
             list: A list of pandas.DataFrame objects representing the cleaned tables.
         """
+        import pymupdf
+
         cleaned_tables = []
         doc = pymupdf.open(file_path)
         for page in doc:
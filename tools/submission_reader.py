@@ -0,0 +1,160 @@
+import mmap
+import re
+from typing import Callable, Iterator, NamedTuple, Tuple
+
+DOCUMENT_PATTERN = re.compile(rb'<DOCUMENT>(.*?)</DOCUMENT>', re.DOTALL)
+TEXT_PATTERN = re.compile(rb'<TEXT>', re.IGNORECASE)
+TAG_PATTERN = re.compile(rb'<(TYPE|FILENAME)>([^\r\n<]*)', re.IGNORECASE)
+TABLE_TAG_PATTERN = re.compile(rb'<(/?)table\b[^>]*>', re.IGNORECASE)
+# Uuencoded bodies may be wrapped in a bare tag such as <PDF> or <XBRL> before the header
+UUENCODE_PATTERN = re.compile(rb'\s*(?:<[A-Za-z]+>\s*)*begin [0-7]{3} ')
+
+BINARY_EXTENSIONS = (b'.jpg', b'.jpeg', b'.gif', b'.png', b'.pdf', b'.zip', b'.xls', b'.xlsx')
+
+
+class DocumentSlice(NamedTuple):
+    """Byte range of one <DOCUMENT> body inside a submission file."""
+
+    type: str
+    filename: str
+    start: int
+    end: int
+
+
+class SubmissionReader:
+    """
+    Memory-maps SEC filings and locates documents and tables with a
+    byte-level scan, so only the table regions are ever decoded and parsed.
+
+    Works for full submission text files (`.txt` bundles of <DOCUMENT>
+    blocks) as well as single HTML documents, which are treated as one
+    document spanning the whole file. Uuencoded and binary exhibits are
+    skipped without being decoded.
+    """
+
+    def __init__(self, encoding: str = 'utf-8') -> None:
+        """
+        Initialize the SubmissionReader class.
+
+        Args:
+            encoding (str): Encoding used to decode the table slices.
+        """
+        self.encoding = encoding
+
+    def _is_binary(self, buffer, document: DocumentSlice) -> bool:
+        """
+        Check whether a document is a binary exhibit by its filename or a
+        uuencode header at the start of its text, possibly behind wrapper tags.
+        """
+        if document.filename.lower().encode().endswith(BINARY_EXTENSIONS):
+            return True
+        return UUENCODE_PATTERN.match(buffer, document.start, min(document.end, document.start + 256)) is not None
+
+    def get_documents(self, buffer) -> list:
+        """
+        Locate the text body of every <DOCUMENT> in a memory-mapped submission.
+
+        Args:
+            buffer (mmap.mmap): The memory-mapped file.
+
+        Returns:
+            list: DocumentSlice objects; a single slice covering the whole file if it has no <DOCUMENT> blocks.
+        """
+        documents = []
+        for match in DOCUMENT_PATTERN.finditer(buffer):
+            start, end = match.span(1)
+            text = TEXT_PATTERN.search(buffer, start, end)
+            # Header tags (<TYPE>, <FILENAME>, ...) sit between <DOCUMENT> and <TEXT>
+            header_end = text.start() if text else start
+            tags = {name.upper(): value.strip().decode(self.encoding, errors='replace') for name, value in TAG_PATTERN.findall(buffer[start:header_end])}
+            documents.append(DocumentSlice(tags.get(b'TYPE', ''), tags.get(b'FILENAME', ''), text.end() if text else start, end))
+
+        if not documents:
+            documents.append(DocumentSlice('', '', 0, len(buffer)))
+        return documents
+
+    def get_table_ranges(self, buffer, start: int, end: int) -> list:
+        """
+        Find every <table>...</table> region between two offsets, nested
+        tables included as regions of their own, in the order the opening
+        tags appear (the order of BeautifulSoup's find_all('table')).
+        Unclosed tables are skipped.
+
+        Args:
+            buffer (mmap.mmap): The memory-mapped file.
+            start (int): Offset to start scanning at.
+            end (int): Offset to stop scanning at.
+
+        Returns:
+            list: (start, end) byte offsets of each table.
+        """
+        ranges = []
+        open_tables = []
+        for match in TABLE_TAG_PATTERN.finditer(buffer, start, end):
+            if not match.group(1):
+                open_tables.append(match.start())
+            elif open_tables:
+                ranges.append((open_tables.pop(), match.end()))
+        # Inner tables close first; sort back into opening-tag order
+        ranges.sort()
+        return ranges
+
+    def _iter_ranges(self, file_path) -> Iterator[tuple]:
+        """
+        Map a filing and yield every table range of its non-binary documents
+        together with the open buffer, which is only valid during iteration.
+        """
+        with open(file_path, 'rb') as f:
+            try:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files cannot be mapped
+                return
+            with buffer:
+                for document in self.get_documents(buffer):
+                    if self._is_binary(buffer, document):
+                        continue
+                    for table_start, table_end in self.get_table_ranges(buffer, document.start, document.end):
+                        yield buffer, document, table_start, table_end
+
+    def iter_tables(self, file_path) -> Iterator[str]:
+        """
+        Yield the HTML of every table in a filing, skipping binary exhibits.
+
+        Args:
+            file_path (str): Path to a submission text file or HTML document.
+
+        Yields:
+            str: The decoded HTML of one <table> element.
+        """
+        for buffer, _, table_start, table_end in self._iter_ranges(file_path):
+            yield buffer[table_start:table_end].decode(self.encoding, errors='replace')
+
+    def iter_table_ranges(self, file_path) -> Iterator[Tuple[int, int, Callable[[int], Tuple[str, bool]]]]:
+        """
+        Yield the byte range of every table in a filing without decoding the
+        tables themselves.
+
+        Args:
+            file_path (str): Path to a submission text file or HTML document.
+
+        Yields:
+            tuple: (start, end, get_preceding) for one <table> element. get_preceding(context)
+                decodes up to `context` bytes before the table, clipped to its document, and
+                returns them with a flag telling whether the document start was reached. It is
+                only valid until the iteration moves on.
+        """
+        for buffer, document, table_start, table_end in self._iter_ranges(file_path):
+
+            def get_preceding(context, buffer=buffer, document=document, table_start=table_start):
+                window_start = max(document.start, table_start - context)
+                preceding = buffer[window_start:table_start].decode(self.encoding, errors='replace')
+                return preceding, window_start == document.start
+
+            yield table_start, table_end, get_preceding
+
+
+if __name__ == "__main__":
+    reader = SubmissionReader()
+    for index, table in enumerate(reader.iter_tables('nvda-20240128.htm')):
+        print(index, len(table))
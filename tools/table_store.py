@@ -0,0 +1,123 @@
+import json
+import sys
+import tempfile
+from typing import Iterator, Optional
+
+
+class TableRecord:
+    """
+    Compact description of one table in a filing: its position in the
+    table sequence, the byte range of its raw HTML in the source file and
+    the caption text found before it. Holds no reference to a parse tree.
+    """
+
+    __slots__ = ('index', 'start', 'end', 'caption')
+
+    def __init__(self, index: int, start: int, end: int, caption: Optional[str] = None) -> None:
+        self.index = index
+        self.start = start
+        self.end = end
+        self.caption = caption
+
+    def __repr__(self) -> str:
+        return f"TableRecord(index={self.index}, start={self.start}, end={self.end}, caption={self.caption!r})"
+
+    def size(self) -> int:
+        """
+        Approximate memory held by the record, in bytes.
+        """
+        return sys.getsizeof(self) + sys.getsizeof(self.caption)
+
+
+class TableStore:
+    """
+    Sequence of TableRecord objects for one filing that keeps records in
+    memory up to an optional budget and spills the rest to a temporary file.
+
+    A record takes a few hundred bytes, mostly its caption text, so a
+    filing's records rarely matter next to the table HTML, which is never
+    held. Spilling is a safeguard for inputs with a very large number of
+    tables and is off unless a budget is given.
+    """
+
+    def __init__(self, source_path, memory_budget: Optional[int] = None) -> None:
+        """
+        Initialize the TableStore class.
+
+        Args:
+            source_path (str): Path to the filing the byte ranges refer to.
+            memory_budget (int, optional): Bytes of records, as measured by TableRecord.size(), kept
+                in memory before spilling to disk. None keeps every record in memory.
+        """
+        self.source_path = source_path
+        self.memory_budget = memory_budget
+        self.memory_used = 0
+        self.records = []
+        self._spill_file = None
+        self._length = 0
+
+    @property
+    def spilled(self) -> bool:
+        """
+        Whether any record has been written to the on-disk store.
+        """
+        return self._spill_file is not None
+
+    def add(self, record: TableRecord) -> None:
+        """
+        Append a record, spilling it to disk once the memory budget is used up.
+
+        Args:
+            record (TableRecord): The record to store.
+        """
+        self._length += 1
+        size = record.size()
+        if not self.spilled and (self.memory_budget is None or self.memory_used + size <= self.memory_budget):
+            self.records.append(record)
+            self.memory_used += size
+            return
+
+        if not self.spilled:
+            self._spill_file = tempfile.TemporaryFile('w+', encoding='utf-8')
+        self._spill_file.seek(0, 2)
+        self._spill_file.write(json.dumps([record.index, record.start, record.end, record.caption]) + '\n')
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[TableRecord]:
+        yield from self.records
+        if self.spilled:
+            self._spill_file.flush()
+            self._spill_file.seek(0)
+            for line in self._spill_file:
+                yield TableRecord(*json.loads(line))
+
+    def read_html(self, record: TableRecord, encoding: str = 'utf-8') -> str:
+        """
+        Read the raw HTML of a table back from the source file.
+
+        Args:
+            record (TableRecord): The record whose byte range to read.
+            encoding (str): Encoding of the source file.
+
+        Returns:
+            str: The HTML of the <table> element.
+        """
+        with open(self.source_path, 'rb') as f:
+            f.seek(record.start)
+            return f.read(record.end - record.start).decode(encoding, errors='replace')
+
+    def close(self) -> None:
+        """
+        Delete the on-disk store, if any.
+        """
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
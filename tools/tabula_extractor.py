@@ -1,4 +1,3 @@
-import tabula
 import re
 
 from tools.base import BaseClass
@@ -40,6 +39,8 @@ class TabulaExtractor(BaseClass):
         Returns:
             list: A list of pandas.DataFrame objects representing the cleaned tables.
         """
+        import tabula
+
         cleaned_tables = []
         dfs = tabula.read_pdf(file_path, pages='all')
         for df in dfs:
@@ -1,5 +1,3 @@
-from weasyprint import HTML
-
 class Weasy:
     """
     A helper class to convert HTML strings to PNG or PDF using WeasyPrint.
@@ -64,6 +62,8 @@ class Weasy:
         Returns:
             str: The file path of the saved PNG image.
         """
+        from weasyprint import HTML
+
         try:
             if override_css:
                 html_string = self._get_html_with_css(html_string)
@@ -73,6 +73,21 @@ class Weasy:
             print(f"Error converting HTML to image: {e}")
             return ""
         
+    def html_tables_to_image(self, tables: dict, file_path: str = 'files/weasy.png') -> str:
+        """
+        Render several HTML tables, stacked and each labelled with its index,
+        into a single PNG image.
+        
+        Args:
+            tables (dict): HTML table strings keyed by table index.
+            file_path (str): The file path where the PNG image will be saved.
+        
+        Returns:
+            str: The file path of the saved PNG image.
+        """
+        html_string = ''.join(f'<h3>Table {index}</h3>{table}' for index, table in tables.items())
+        return self.html_to_image(html_string, file_path)
+
     def html_to_pdf(self, html_string: str, file_path: str = 'files/weasy.pdf', override_css: bool = True) -> str:
         """
         Convert an HTML string to a PDF document.
@@ -85,6 +100,8 @@ class Weasy:
         Returns:
             str: The file path of the saved PDF document.
         """
+        from weasyprint import HTML
+
         try:
             if override_css:
                 html_string = self._get_html_with_css(html_string)